@@ -28,6 +28,12 @@ class Settings(BaseSettings):
     chunk_overlap: int = 50
     max_upload_size_bytes: int = 5 * 1024 * 1024  # 5 MB
     
+    # Embeddings
+    embedding_batch_size: int = 96
+    embedding_max_chars_per_batch: int = 100_000
+    embedding_max_concurrency: int = 4
+    query_embedding_cache_size: int = 2048
+    
     # RAG
     top_k_results: int = 5
     
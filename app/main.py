@@ -1,7 +1,9 @@
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from app.database import engine, Base
 from app.routers import documents, query
+from app.services.http_client import openrouter_client
 
 # Create database tables
 Base.metadata.create_all(bind=engine)
@@ -9,7 +11,8 @@ Base.metadata.create_all(bind=engine)
 app = FastAPI(
     title="RAG Document Search API",
     description="AI-powered document search with RAG using vector embeddings",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 # CORS middleware
@@ -26,6 +29,11 @@ app.include_router(documents.router)
 app.include_router(query.router)
 
 
+@app.on_event("shutdown")
+async def close_http_client():
+    await openrouter_client.aclose()
+
+
 @app.get("/")
 async def root():
     return {
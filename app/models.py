@@ -1,4 +1,4 @@
-from sqlalchemy import Column, String, Integer, DateTime, Text, Enum as SQLEnum
+from sqlalchemy import Column, String, Integer, DateTime, Text, Index, Enum as SQLEnum
 from sqlalchemy.sql import func
 from datetime import datetime
 import enum
@@ -28,11 +28,15 @@ class Document(Base):
 
 class DocumentChunk(Base):
     __tablename__ = "document_chunks"
+    # Also serves lookups on document_id alone
+    __table_args__ = (
+        Index("ix_doc_chunk_doc_idx", "document_id", "chunk_index"),
+    )
     
     id = Column(String, primary_key=True, index=True)
-    document_id = Column(String, index=True, nullable=False)
+    document_id = Column(String, nullable=False)
     chunk_index = Column(Integer, nullable=False)
-    text = Column(Text, nullable=False)
+    text = Column(Text, nullable=True)  # Unused; chunk text lives in the vector DB
     token_count = Column(Integer, nullable=False)
     vector_id = Column(String, nullable=True)  # ID in vector DB
     created_at = Column(DateTime(timezone=True), server_default=func.now())
\ No newline at end of file
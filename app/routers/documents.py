@@ -1,14 +1,18 @@
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File
-from sqlalchemy.orm import Session
-from typing import List
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, status, UploadFile, File
+from sqlalchemy import select
+from sqlalchemy.orm import Session, defer
+from typing import BinaryIO, List, Optional
+import asyncio
+import tempfile
 import uuid
-from app.database import get_db
+from app.database import SessionLocal, get_db
 from app.config import get_settings
 from app.models import Document, DocumentChunk, DocumentStatus
 from app.schemas import (
     DocumentUploadResponse,
     DocumentListItem,
-    DocumentDetailResponse
+    DocumentDetailResponse,
+    DocumentChunkItem
 )
 from app.services.document_processor import DocumentProcessor
 from app.services.embedding_service import EmbeddingService
@@ -16,109 +20,102 @@ from app.services.vector_store import get_vector_store
 
 router = APIRouter(prefix="/documents", tags=["Documents"])
 settings = get_settings()
+embedding_service = EmbeddingService()
 
+# Uploads are read in 64 KB pieces and spill to disk past 1 MB
+_UPLOAD_READ_SIZE = 64 * 1024
+_UPLOAD_SPOOL_MAX_SIZE = 1024 * 1024
 
-@router.post("/upload", response_model=DocumentUploadResponse, status_code=status.HTTP_201_CREATED)
-async def upload_document(
-    file: UploadFile = File(...),
-    db: Session = Depends(get_db)
+# Only the columns needed for DocumentListItem, newest first
+_LIST_STMT = select(
+    Document.id,
+    Document.filename,
+    Document.file_type,
+    Document.file_size,
+    Document.status,
+    Document.chunk_count,
+    Document.created_at
+).order_by(Document.created_at.desc())
+
+
+async def _process_document(
+    doc_id: str,
+    file: BinaryIO,
+    file_type: str,
+    filename: str
 ):
     """
-    Upload and process a document (PDF, DOCX, or TXT).
-    Extracts text, chunks it, generates embeddings, and stores in vector DB.
+    Extract text, chunk it, generate embeddings, and store in vector DB.
+    Runs as a background task after the upload request has returned.
     """
-    # Validate file type
-    allowed_types = {
-        "application/pdf": "pdf",
-        "application/vnd.openxmlformats-officedocument.wordprocessingml.document": "docx",
-        "text/plain": "txt"
-    }
+    db = SessionLocal()
+    document = db.query(Document).filter(Document.id == doc_id).first()
     
-    if file.content_type not in allowed_types:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail=f"Unsupported file type. Allowed: PDF, DOCX, TXT"
-        )
-    
-    file_type = allowed_types[file.content_type]
+    # The document may have been deleted before processing started
+    if not document:
+        db.close()
+        file.close()
+        return
     
     try:
-        # Read file content
-        file_content = await file.read()
-        file_size = len(file_content)
-        
-        if file_size > settings.max_upload_size_bytes:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"File too large. Maximum size allowed is {settings.max_upload_size_bytes / (1024*1024)}MB"
-            )
-        
-        # Create document record
-        doc_id = str(uuid.uuid4())
-        document = Document(
-            id=doc_id,
-            filename=file.filename,
-            file_type=file_type,
-            file_size=file_size,
-            status=DocumentStatus.PROCESSING
-        )
-        db.add(document)
-        db.commit()
-        
-        # Process document
         processor = DocumentProcessor(
             chunk_size=settings.chunk_size,
             chunk_overlap=settings.chunk_overlap
         )
         
-        # Extract text
-        extracted_text = processor.extract_text(file_content, file_type)
+        # Extract and chunk text off the event loop
+        extracted_text = await asyncio.to_thread(
+            processor.extract_text, file, file_type
+        )
         document.extracted_text = extracted_text
         
-        # Chunk text
-        chunks = processor.chunk_text(extracted_text)
+        chunks = await asyncio.to_thread(processor.chunk_text, extracted_text)
         
         if not chunks:
             document.status = DocumentStatus.FAILED
             document.error_message = "No text could be extracted from document"
             db.commit()
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="No text could be extracted"
-            )
+            return
         
-        # Generate embeddings
-        embedding_service = EmbeddingService()
+        # Build chunk rows and vector store entries
         chunk_texts = [chunk[0] for chunk in chunks]
-        embeddings = await embedding_service.generate_embeddings(chunk_texts)
-        
-        # Store chunks in database and vector store
-        vector_store = get_vector_store()
         chunk_ids = []
         chunk_metadatas = []
+        chunk_rows = []
         
         for idx, (chunk_text, token_count) in enumerate(chunks):
             chunk_id = f"{doc_id}_chunk_{idx}"
             
-            # Save to database
-            chunk_record = DocumentChunk(
-                id=chunk_id,
-                document_id=doc_id,
-                chunk_index=idx,
-                text=chunk_text,
-                token_count=token_count,
-                vector_id=chunk_id
-            )
-            db.add(chunk_record)
+            chunk_rows.append({
+                "id": chunk_id,
+                "document_id": doc_id,
+                "chunk_index": idx,
+                "token_count": token_count,
+                "vector_id": chunk_id
+            })
             
             chunk_ids.append(chunk_id)
             chunk_metadatas.append({
                 "document_id": doc_id,
                 "chunk_index": idx,
-                "filename": file.filename
+                "filename": filename
             })
         
+        # Generate embeddings while the chunks are bulk inserted into the database.
+        # Wait for both before raising: the insert thread can't be cancelled,
+        # and the session must be idle before it is rolled back.
+        results = await asyncio.gather(
+            embedding_service.generate_embeddings(chunk_texts),
+            asyncio.to_thread(db.execute, DocumentChunk.__table__.insert(), chunk_rows),
+            return_exceptions=True
+        )
+        for result in results:
+            if isinstance(result, BaseException):
+                raise result
+        embeddings = results[0]
+        
         # Add to vector store
+        vector_store = get_vector_store()
         await vector_store.add_vectors(
             ids=chunk_ids,
             embeddings=embeddings,
@@ -131,27 +128,107 @@ async def upload_document(
         document.status = DocumentStatus.COMPLETED
         db.commit()
         
-        return DocumentUploadResponse(
+    except Exception as e:
+        db.rollback()
+        
+        try:
+            # Vectors may already be stored; queries read them straight from
+            # the vector store, so remove them before anything else can fail
+            await get_vector_store().delete_by_document(doc_id)
+        finally:
+            # Mark document as failed, unless it was deleted while processing
+            document = db.query(Document).filter(Document.id == doc_id).first()
+            if document:
+                document.status = DocumentStatus.FAILED
+                document.error_message = str(e)
+                db.commit()
+    
+    finally:
+        db.close()
+        file.close()
+
+
+@router.post("/upload", response_model=DocumentUploadResponse, status_code=status.HTTP_202_ACCEPTED)
+async def upload_document(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...),
+    db: Session = Depends(get_db)
+):
+    """
+    Upload a document (PDF, DOCX, or TXT) and queue it for processing.
+    The document is returned with PROCESSING status; poll GET /documents/{id}
+    to see when it has been indexed.
+    """
+    # Validate file type
+    allowed_types = {
+        "application/pdf": "pdf",
+        "application/vnd.openxmlformats-officedocument.wordprocessingml.document": "docx",
+        "text/plain": "txt"
+    }
+    
+    if file.content_type not in allowed_types:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported file type. Allowed: PDF, DOCX, TXT"
+        )
+    
+    file_type = allowed_types[file.content_type]
+    
+    spooled_file = tempfile.SpooledTemporaryFile(max_size=_UPLOAD_SPOOL_MAX_SIZE)
+    
+    try:
+        # Stream file content, rejecting it as soon as it exceeds the limit
+        file_size = 0
+        while chunk := await file.read(_UPLOAD_READ_SIZE):
+            file_size += len(chunk)
+            
+            if file_size > settings.max_upload_size_bytes:
+                raise HTTPException(
+                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail=f"File too large. Maximum size allowed is {settings.max_upload_size_bytes / (1024*1024)}MB"
+                )
+            
+            spooled_file.write(chunk)
+        
+        spooled_file.seek(0)
+        
+        # Create document record
+        doc_id = str(uuid.uuid4())
+        document = Document(
             id=doc_id,
             filename=file.filename,
             file_type=file_type,
-            status=DocumentStatus.COMPLETED,
-            message=f"Document processed successfully. Created {len(chunks)} chunks."
+            file_size=file_size,
+            status=DocumentStatus.PROCESSING
         )
+        db.add(document)
+        db.commit()
         
     except HTTPException:
+        spooled_file.close()
         raise
     except Exception as e:
-        # Mark document as failed
-        if document:
-            document.status = DocumentStatus.FAILED
-            document.error_message = str(e)
-            db.commit()
-        
+        spooled_file.close()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Failed to process document: {str(e)}"
         )
+    
+    background_tasks.add_task(
+        _process_document,
+        doc_id,
+        spooled_file,
+        file_type,
+        file.filename
+    )
+    
+    return DocumentUploadResponse(
+        id=doc_id,
+        filename=file.filename,
+        file_type=file_type,
+        status=DocumentStatus.PROCESSING,
+        message="Document accepted for processing."
+    )
 
 
 @router.get("", response_model=List[DocumentListItem])
@@ -163,11 +240,7 @@ async def list_documents(
     """
     List all uploaded documents with their metadata and chunk counts.
     """
-    documents = db.query(Document)\
-        .order_by(Document.created_at.desc())\
-        .offset(skip)\
-        .limit(limit)\
-        .all()
+    documents = db.execute(_LIST_STMT.offset(skip).limit(limit)).all()
     
     return documents
 
@@ -175,12 +248,22 @@ async def list_documents(
 @router.get("/{document_id}", response_model=DocumentDetailResponse)
 async def get_document_detail(
     document_id: str,
+    include_text: bool = False,
+    include_chunks: bool = True,
+    chunk_skip: int = Query(0, ge=0),
+    chunk_limit: Optional[int] = Query(None, ge=1),
     db: Session = Depends(get_db)
 ):
     """
-    Get detailed information about a specific document including all chunks.
+    Get detailed information about a specific document and its chunks.
+    The full extracted text is only returned when include_text is set,
+    since it repeats the chunk text. Chunks can be paged with chunk_skip
+    and chunk_limit, or left out with include_chunks=false.
     """
-    document = db.query(Document).filter(Document.id == document_id).first()
+    query = db.query(Document).filter(Document.id == document_id)
+    if not include_text:
+        query = query.options(defer(Document.extracted_text))
+    document = query.first()
     
     if not document:
         raise HTTPException(
@@ -188,21 +271,29 @@ async def get_document_detail(
             detail="Document not found"
         )
     
-    # Get all chunks
-    chunks = db.query(DocumentChunk)\
-        .filter(DocumentChunk.document_id == document_id)\
-        .order_by(DocumentChunk.chunk_index)\
-        .all()
-    
-    chunks_data = [
-        {
-            "id": chunk.id,
-            "chunk_index": chunk.chunk_index,
-            "text": chunk.text,
-            "token_count": chunk.token_count
-        }
-        for chunk in chunks
-    ]
+    chunks_data = []
+    
+    if include_chunks:
+        chunks = db.query(DocumentChunk)\
+            .filter(DocumentChunk.document_id == document_id)\
+            .order_by(DocumentChunk.chunk_index)\
+            .offset(chunk_skip)\
+            .limit(chunk_limit)\
+            .all()
+        
+        # Chunk text is stored only in the vector store
+        vector_store = get_vector_store()
+        chunk_texts = await vector_store.get_texts([chunk.id for chunk in chunks])
+        
+        chunks_data = [
+            DocumentChunkItem(
+                id=chunk.id,
+                chunk_index=chunk.chunk_index,
+                text=chunk_texts.get(chunk.id),
+                token_count=chunk.token_count
+            )
+            for chunk in chunks
+        ]
     
     return DocumentDetailResponse(
         id=document.id,
@@ -211,7 +302,7 @@ async def get_document_detail(
         file_size=document.file_size,
         status=document.status,
         chunk_count=document.chunk_count,
-        extracted_text=document.extracted_text,
+        extracted_text=document.extracted_text if include_text else None,
         created_at=document.created_at,
         chunks=chunks_data
     )
@@ -25,6 +25,13 @@ class DocumentListItem(BaseModel):
         from_attributes = True
 
 
+class DocumentChunkItem(BaseModel):
+    id: str
+    chunk_index: int
+    text: Optional[str]
+    token_count: int
+
+
 class DocumentDetailResponse(BaseModel):
     id: str
     filename: str
@@ -34,7 +41,7 @@ class DocumentDetailResponse(BaseModel):
     chunk_count: int
     extracted_text: Optional[str]
     created_at: datetime
-    chunks: List[dict]
+    chunks: List[DocumentChunkItem]
     
     class Config:
         from_attributes = True
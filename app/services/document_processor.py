@@ -1,8 +1,57 @@
-import PyPDF2
+import fitz
 from docx import Document as DocxDocument
 import tiktoken
-from typing import List, Tuple
-import io
+from typing import BinaryIO, List, Tuple
+import re
+import numpy as np
+from numba import njit
+
+_SENTENCE_RE = re.compile(r'(?<=[.!?])\s+')
+_NEWLINES_TO_SPACES = str.maketrans({'\n': ' ', '\r': ' '})
+
+
+@njit(cache=True)
+def _pack_spans(counts: np.ndarray, chunk_size: int, chunk_overlap: int) -> np.ndarray:
+    """
+    Greedily pack consecutive units into chunks of at most chunk_size tokens.
+    Each chunk after the first starts with the trailing units of the previous
+    chunk that fit in chunk_overlap tokens. Returns (start, end, token_count)
+    rows, one per chunk.
+    """
+    n = counts.shape[0]
+    # Every chunk ends at least one unit past the previous one, so n bounds the count
+    spans = np.empty((n, 3), dtype=np.int64)
+    if n == 0:
+        return spans
+    
+    # prefix[i] is the token count of units[:i]
+    prefix = np.zeros(n + 1, dtype=np.int64)
+    for i in range(n):
+        prefix[i + 1] = prefix[i] + counts[i]
+    
+    n_spans = 0
+    start, min_end = 0, 1
+    while True:
+        end = np.searchsorted(prefix, prefix[start] + chunk_size, side="right") - 1
+        end = max(end, min_end)
+        spans[n_spans, 0] = start
+        spans[n_spans, 1] = end
+        spans[n_spans, 2] = prefix[end] - prefix[start]
+        n_spans += 1
+        
+        if end >= n:
+            break
+        
+        # Overlap is taken from the tail of the chunk just emitted
+        overlap_start = np.searchsorted(prefix, prefix[end] - chunk_overlap, side="left")
+        start = max(overlap_start, start)
+        min_end = end + 1
+    
+    return spans[:n_spans]
+
+
+# Compile ahead of the first upload
+_pack_spans(np.ones(1, dtype=np.int64), 1, 0)
 
 
 class DocumentProcessor:
@@ -11,38 +60,29 @@ class DocumentProcessor:
         self.chunk_overlap = chunk_overlap
         self.tokenizer = tiktoken.get_encoding("cl100k_base")
     
-    def extract_text(self, file_content: bytes, file_type: str) -> str:
-        """Extract text from different file types."""
+    def extract_text(self, file: BinaryIO, file_type: str) -> str:
+        """Extract text from a file-like object of the given type."""
         if file_type == "pdf":
-            return self._extract_pdf(file_content)
+            return self._extract_pdf(file)
         elif file_type == "docx":
-            return self._extract_docx(file_content)
+            return self._extract_docx(file)
         elif file_type == "txt":
-            return file_content.decode('utf-8')
+            return file.read().decode('utf-8')
         else:
             raise ValueError(f"Unsupported file type: {file_type}")
     
-    def _extract_pdf(self, file_content: bytes) -> str:
+    def _extract_pdf(self, file: BinaryIO) -> str:
         """Extract text from PDF."""
-        pdf_file = io.BytesIO(file_content)
-        pdf_reader = PyPDF2.PdfReader(pdf_file)
+        with fitz.open(stream=file.read(), filetype="pdf") as doc:
+            pages = [page.get_text() for page in doc]
         
-        text = ""
-        for page in pdf_reader.pages:
-            text += page.extract_text() + "\n"
-        
-        return text.strip()
+        return "\n".join(pages).strip()
     
-    def _extract_docx(self, file_content: bytes) -> str:
+    def _extract_docx(self, file: BinaryIO) -> str:
         """Extract text from DOCX."""
-        docx_file = io.BytesIO(file_content)
-        doc = DocxDocument(docx_file)
-        
-        text = ""
-        for paragraph in doc.paragraphs:
-            text += paragraph.text + "\n"
+        doc = DocxDocument(file)
         
-        return text.strip()
+        return "\n".join(paragraph.text for paragraph in doc.paragraphs).strip()
     
     def count_tokens(self, text: str) -> int:
         """Count tokens in text."""
@@ -56,83 +96,66 @@ class DocumentProcessor:
         # Split into sentences (simple approach)
         sentences = self._split_into_sentences(text)
         
+        # Encode all sentences in one batch instead of one call per sentence
+        sentence_counts = np.asarray(
+            [len(tokens) for tokens in self.tokenizer.encode_batch(sentences)],
+            dtype=np.int64
+        )
+        
         chunks = []
-        current_chunk = []
-        current_tokens = 0
+        carry_units: List[str] = []
+        carry_counts = np.empty(0, dtype=np.int64)
+        run_start = 0
         
-        for sentence in sentences:
-            sentence_tokens = self.count_tokens(sentence)
+        # Sentences longer than chunk_size break the text into runs that are
+        # packed independently; everything in between is packed in bulk.
+        long_sentences = np.flatnonzero(sentence_counts > self.chunk_size).tolist()
+        
+        for run_end in long_sentences + [len(sentences)]:
+            units = carry_units + sentences[run_start:run_end]
+            unit_counts = np.concatenate(
+                (carry_counts, sentence_counts[run_start:run_end])
+            )
             
-            # If single sentence exceeds chunk size, split it further
-            if sentence_tokens > self.chunk_size:
-                # Add current chunk if it has content
-                if current_chunk:
-                    chunk_text = " ".join(current_chunk)
-                    chunks.append((chunk_text, current_tokens))
-                    current_chunk = []
-                    current_tokens = 0
-                
-                # Split long sentence into smaller parts
-                words = sentence.split()
-                temp_chunk = []
-                temp_tokens = 0
-                
-                for word in words:
-                    word_tokens = self.count_tokens(word)
-                    if temp_tokens + word_tokens > self.chunk_size:
-                        if temp_chunk:
-                            chunk_text = " ".join(temp_chunk)
-                            chunks.append((chunk_text, temp_tokens))
-                        temp_chunk = [word]
-                        temp_tokens = word_tokens
-                    else:
-                        temp_chunk.append(word)
-                        temp_tokens += word_tokens
-                
-                if temp_chunk:
-                    current_chunk = temp_chunk
-                    current_tokens = temp_tokens
+            spans = _pack_spans(unit_counts, self.chunk_size, self.chunk_overlap)
             
-            # Check if adding sentence exceeds chunk size
-            elif current_tokens + sentence_tokens > self.chunk_size:
-                # Save current chunk
-                chunk_text = " ".join(current_chunk)
-                chunks.append((chunk_text, current_tokens))
-                
-                # Start new chunk with overlap
-                # Keep last few sentences for overlap
-                overlap_sentences = []
-                overlap_tokens = 0
-                
-                for sent in reversed(current_chunk):
-                    sent_tokens = self.count_tokens(sent)
-                    if overlap_tokens + sent_tokens <= self.chunk_overlap:
-                        overlap_sentences.insert(0, sent)
-                        overlap_tokens += sent_tokens
-                    else:
-                        break
-                
-                current_chunk = overlap_sentences + [sentence]
-                current_tokens = overlap_tokens + sentence_tokens
-            else:
-                current_chunk.append(sentence)
-                current_tokens += sentence_tokens
-        
-        # Add final chunk
-        if current_chunk:
-            chunk_text = " ".join(current_chunk)
-            chunks.append((chunk_text, current_tokens))
+            for start, end, token_count in spans.tolist():
+                chunk_text = " ".join(units[start:end])
+                chunks.append((chunk_text, token_count))
+            
+            carry_units = []
+            carry_counts = np.empty(0, dtype=np.int64)
+            
+            if run_end == len(sentences):
+                break
+            
+            # Split long sentence into smaller parts, without overlap
+            words = sentences[run_end].split()
+            word_counts = np.asarray(
+                [len(tokens) for tokens in self.tokenizer.encode_batch(words)],
+                dtype=np.int64
+            )
+            word_spans = _pack_spans(word_counts, self.chunk_size, 0)
+            
+            for start, end, token_count in word_spans[:-1].tolist():
+                chunk_text = " ".join(words[start:end])
+                chunks.append((chunk_text, token_count))
+            
+            # The last part stays open and is packed with the following sentences
+            start, end, _ = word_spans[-1]
+            carry_units = words[start:end]
+            carry_counts = word_counts[start:end]
+            run_start = run_end + 1
         
         return chunks
     
     def _split_into_sentences(self, text: str) -> List[str]:
         """Simple sentence splitter."""
         # Clean text
-        text = text.replace('\n', ' ').replace('\r', ' ')
+        text = text.translate(_NEWLINES_TO_SPACES)
         
         # Split on common sentence endings
-        import re
-        sentences = re.split(r'(?<=[.!?])\s+', text)
+        sentences = _SENTENCE_RE.split(text)
         
         # Filter out empty sentences
         sentences = [s.strip() for s in sentences if s.strip()]
@@ -1,24 +1,92 @@
-import httpx
-from typing import List
+import asyncio
+from collections import OrderedDict
+from typing import List, Tuple
 from app.config import get_settings
+from app.services.http_client import openrouter_client
 
 settings = get_settings()
 
+# Caps batch requests in flight across all uploads in this process
+_batch_semaphore = asyncio.Semaphore(settings.embedding_max_concurrency)
+
+# Query embeddings keyed by (model, normalized question), least recently used first
+_query_cache: "OrderedDict[Tuple[str, str], List[float]]" = OrderedDict()
+
 
 class EmbeddingService:
     def __init__(self):
         self.api_key = settings.openrouter_api_key
         self.model = settings.embedding_model
-        self.base_url = "https://openrouter.ai/api/v1"
+        self.batch_size = settings.embedding_batch_size
+        self.max_chars_per_batch = settings.embedding_max_chars_per_batch
+        self.query_cache_size = settings.query_embedding_cache_size
     
     async def generate_embedding(self, text: str) -> List[float]:
         """Generate embedding for a single text."""
-        embeddings = await self.generate_embeddings([text])
+        embeddings = await self._request_embeddings([text])
         return embeddings[0]
     
+    async def generate_query_embedding(self, question: str) -> List[float]:
+        """
+        Generate embedding for a search question. Questions that differ only
+        in case or whitespace share a cached embedding.
+        """
+        normalized = " ".join(question.lower().split())
+        key = (self.model, normalized)
+        
+        embedding = _query_cache.get(key)
+        if embedding is not None:
+            _query_cache.move_to_end(key)
+            return embedding
+        
+        # Embed the question as asked; case can matter to the model
+        embedding = await self.generate_embedding(question.strip())
+        
+        _query_cache[key] = embedding
+        if len(_query_cache) > self.query_cache_size:
+            _query_cache.popitem(last=False)
+        
+        return embedding
+    
     async def generate_embeddings(self, texts: List[str]) -> List[List[float]]:
-        """Generate embeddings for multiple texts."""
-        url = f"{self.base_url}/embeddings"
+        """Generate embeddings for multiple texts, sending batches in parallel."""
+        batches = self._make_batches(texts)
+        results = await asyncio.gather(
+            *[self._request_batch(batch) for batch in batches]
+        )
+        
+        return [embedding for batch in results for embedding in batch]
+    
+    def _make_batches(self, texts: List[str]) -> List[List[str]]:
+        """Split texts into batches bounded by item count and total characters."""
+        batches = []
+        current_batch = []
+        current_chars = 0
+        
+        for text in texts:
+            if current_batch and (
+                len(current_batch) >= self.batch_size
+                or current_chars + len(text) > self.max_chars_per_batch
+            ):
+                batches.append(current_batch)
+                current_batch = []
+                current_chars = 0
+            
+            current_batch.append(text)
+            current_chars += len(text)
+        
+        if current_batch:
+            batches.append(current_batch)
+        
+        return batches
+    
+    async def _request_batch(self, texts: List[str]) -> List[List[float]]:
+        """Request embeddings for one batch, waiting for a free request slot."""
+        async with _batch_semaphore:
+            return await self._request_embeddings(texts)
+    
+    async def _request_embeddings(self, texts: List[str]) -> List[List[float]]:
+        """Request embeddings for a single batch of texts."""
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
@@ -29,11 +97,12 @@ class EmbeddingService:
             "input": texts
         }
         
-        async with httpx.AsyncClient(timeout=30.0) as client:
-            response = await client.post(url, json=payload, headers=headers)
-            response.raise_for_status()
-            
-            data = response.json()
-            embeddings = [item["embedding"] for item in data["data"]]
-            
-            return embeddings
\ No newline at end of file
+        response = await openrouter_client.post(
+            "/embeddings", json=payload, headers=headers, timeout=30.0
+        )
+        response.raise_for_status()
+        
+        data = response.json()
+        embeddings = [item["embedding"] for item in data["data"]]
+        
+        return embeddings
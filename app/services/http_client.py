@@ -0,0 +1,11 @@
+import httpx
+
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+# Shared client for all OpenRouter calls so connections are pooled and reused
+openrouter_client = httpx.AsyncClient(
+    base_url=OPENROUTER_BASE_URL,
+    timeout=60.0,
+    http2=True,
+    limits=httpx.Limits(max_connections=100, max_keepalive_connections=50)
+)
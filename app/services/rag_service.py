@@ -1,6 +1,6 @@
-import httpx
 from typing import List, Dict
 from app.config import get_settings
+from app.services.http_client import openrouter_client
 
 settings = get_settings()
 
@@ -9,7 +9,6 @@ class RAGService:
     def __init__(self):
         self.api_key = settings.openrouter_api_key
         self.model = settings.llm_model
-        self.base_url = "https://openrouter.ai/api/v1"
     
     def build_rag_prompt(self, question: str, contexts: List[str]) -> str:
         """Build RAG prompt with context."""
@@ -39,7 +38,6 @@ Answer:"""
         """Generate answer using LLM."""
         prompt = self.build_rag_prompt(question, contexts)
         
-        url = f"{self.base_url}/chat/completions"
         headers = {
             "Authorization": f"Bearer {self.api_key}",
             "Content-Type": "application/json"
@@ -54,11 +52,12 @@ Answer:"""
             "max_tokens": 1000
         }
         
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            response = await client.post(url, json=payload, headers=headers)
-            response.raise_for_status()
-            
-            data = response.json()
-            answer = data["choices"][0]["message"]["content"]
-            
-            return answer
\ No newline at end of file
+        response = await openrouter_client.post(
+            "/chat/completions", json=payload, headers=headers
+        )
+        response.raise_for_status()
+        
+        data = response.json()
+        answer = data["choices"][0]["message"]["content"]
+        
+        return answer
\ No newline at end of file
@@ -1,5 +1,6 @@
 from typing import List, Dict, Tuple
 from abc import ABC, abstractmethod
+from functools import lru_cache
 import chromadb
 from chromadb.config import Settings as ChromaSettings
 from app.config import get_settings
@@ -23,7 +24,11 @@ class VectorStore(ABC):
         self, 
         query_embedding: List[float], 
         top_k: int
-    ) -> List[Tuple[str, float, Dict]]:
+    ) -> List[Tuple[str, float, Dict, str]]:
+        pass
+    
+    @abstractmethod
+    async def get_texts(self, ids: List[str]) -> Dict[str, str]:
         pass
     
     @abstractmethod
@@ -61,38 +66,44 @@ class ChromaVectorStore(VectorStore):
         self, 
         query_embedding: List[float], 
         top_k: int
-    ) -> List[Tuple[str, float, Dict]]:
+    ) -> List[Tuple[str, float, Dict, str]]:
         """Search for similar vectors."""
         results = self.collection.query(
             query_embeddings=[query_embedding],
-            n_results=top_k
+            n_results=top_k,
+            include=["documents", "distances", "metadatas"]
         )
         
-        # Format results: (id, distance, metadata)
+        # Format results: (id, similarity, metadata, text)
         search_results = []
         for i in range(len(results['ids'][0])):
             chunk_id = results['ids'][0][i]
             distance = results['distances'][0][i]
             metadata = results['metadatas'][0][i]
+            text = results['documents'][0][i]
             
             # Convert distance to similarity (cosine distance to similarity)
             similarity = 1 - distance
             
-            search_results.append((chunk_id, similarity, metadata))
+            search_results.append((chunk_id, similarity, metadata, text))
         
         return search_results
     
+    async def get_texts(self, ids: List[str]) -> Dict[str, str]:
+        """Get stored chunk texts by ID."""
+        if not ids:
+            return {}
+        
+        results = self.collection.get(ids=ids, include=["documents"])
+        
+        return dict(zip(results['ids'], results['documents']))
+    
     async def delete_by_document(self, document_id: str):
         """Delete all chunks for a document."""
-        # Query to get all chunk IDs for this document
-        results = self.collection.get(
-            where={"document_id": document_id}
-        )
-        
-        if results['ids']:
-            self.collection.delete(ids=results['ids'])
+        self.collection.delete(where={"document_id": document_id})
 
 
+@lru_cache()
 def get_vector_store() -> VectorStore:
     """Factory function to get appropriate vector store."""
     if settings.vector_db_type == "chroma":